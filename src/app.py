@@ -1,4 +1,5 @@
 # app.py
+import os
 import time
 import streamlit as st
 import random
@@ -6,27 +7,25 @@ import random
 from flashcard import *
 import plotly.express as px
 import pandas as pd
+from categories import CATEGORIES
 from fill_cards import *
 
 # Initialize database
 #db_handler = DatabaseHandler()
-filler = FlashcardGenerator()
+# Set FLASHCARD_DECK to a deck built with compiled_deck.py to run a read-only instance
+filler = FlashcardGenerator(deck_path=os.environ.get("FLASHCARD_DECK"))
 
 # Set Streamlit to wide layout
 st.set_page_config(layout="wide")
 
 st.title("Data Science Learning App")
+if filler.db_handler.read_only:
+    st.info("Read-only deck: flashcards and their status cannot be changed.")
 
 # Tab layout
 tab1, tab2, tab3, tab4 = st.tabs(["Practice Flashcards", "Create/Update Flashcards", "Visualize Flashcards", "DB Browser"])
 
-categories = [
-    "General", "Linear Algebra for Machine Learning", "Bash & Git", "SQL", "Probability & Statistics", "Data Science Fundamentals", 
-    "Machine Learning Fundamentals", "Visualization", "Object Oriented Programming in Python", "Advanced Trees in Machine Learning", "Time Series", "Computer Vision", "Graph Neural Networks", "Backpropagation", 
-    "Databases", "Docker", "Deep Learning", "Streamlit", "NLP", "Transformers", 
-    "Transfer Learning", "LLM Optimization", "Fine Tuning LLMs", "Debugging Deep Learning", 
-    "Vision Transformers", "CV Projects", "Soft Skills"
-]
+categories = list(CATEGORIES)
 
 #HOW TO KEEP UP TO DATE
 
@@ -35,11 +34,15 @@ categories = [
 with tab2:
     st.header("Create/Update Flashcards")
     
-    # Create two columns for mode selection
-    mode_col1, mode_col2 = st.columns(2)
-    
-    with mode_col1:
-        mode = st.radio("Choose mode:", ["Create New", "Update Existing"])
+    if filler.db_handler.read_only:
+        st.info("Flashcards cannot be created or edited on a read-only deck. Edit the database and recompile the deck instead.")
+        mode = None
+    else:
+        # Create two columns for mode selection
+        mode_col1, mode_col2 = st.columns(2)
+        
+        with mode_col1:
+            mode = st.radio("Choose mode:", ["Create New", "Update Existing"])
 
     if mode == "Create New":
         # Create new flashcard form
@@ -90,12 +93,12 @@ with tab2:
             else:
                 st.error("Please fill in all fields.")
 
-    else:  # Update mode
+    elif mode == "Update Existing":  # Update mode
         # Select category first
         selected_category = st.selectbox("Select Category", categories)
 
         # Filter flashcards by the selected category
-        flashcards_in_category = filler.db_handler.get_flashcards_by_category(selected_category)
+        flashcards_in_category = filler.db_handler.get_questions_by_category(selected_category)
 
         if flashcards_in_category:
             # Create a selection box with filtered questions as options
@@ -109,16 +112,18 @@ with tab2:
             # Get the selected flashcard details
             current_flashcard = flashcard_options[selected_flashcard]
             flashcard_id = current_flashcard[0]
+            # Only the selected card's answer and details are loaded
+            _, _, current_answer, _, current_difficulty, _ = filler.db_handler.get_flashcard(flashcard_id)
 
             # Pre-fill form with existing data
             updated_question = st.text_input("Question", value=current_flashcard[1])
-            updated_answer = st.text_area("Answer", value=current_flashcard[2], height=200)
+            updated_answer = st.text_area("Answer", value=current_answer or "", height=200)
             #print(current_flashcard)
             updated_difficulty = st.selectbox(
                 "Difficulty",
                 ["basic", "intermediate", "advanced"],
-                index=["basic", "intermediate", "advanced"].index(current_flashcard[2]) 
-                if current_flashcard[2] in ["basic", "intermediate", "advanced"] else 0  # Default to "basic"
+                index=["basic", "intermediate", "advanced"].index(current_difficulty) 
+                if current_difficulty in ["basic", "intermediate", "advanced"] else 0  # Default to "basic"
             )
             
             col1, col2 = st.columns(2)
@@ -126,14 +131,16 @@ with tab2:
                 if st.button("Update Flashcard", use_container_width=True):
                     if updated_question and updated_answer:
                         # Update flashcard in the database
-                        filler.db_handler.update_flashcard(
+                        if filler.db_handler.update_flashcard(
                             flashcard_id,
                             updated_question,
                             updated_answer,
                             selected_category,
                             updated_difficulty
-                        )
-                        st.success("Flashcard updated successfully!")
+                        ):
+                            st.success("Flashcard updated successfully!")
+                        else:
+                            st.error("Failed to update the flashcard.")
                     else:
                         st.error("Please fill in all fields.")
             
@@ -141,9 +148,11 @@ with tab2:
                 if st.button("Delete Flashcard", use_container_width=True):
                     # Confirm deletion
                     if st.button("Confirm Deletion", key="confirm_delete"):
-                        filler.db_handler.delete_flashcard(flashcard_id)
-                        st.success("Flashcard deleted successfully!")
-                        st.rerun()
+                        if filler.db_handler.delete_flashcard(flashcard_id):
+                            st.success("Flashcard deleted successfully!")
+                            st.rerun()
+                        else:
+                            st.error("Failed to delete the flashcard.")
         else:
             st.warning(f"No flashcards available in the '{selected_category}' category.")
 
@@ -174,7 +183,7 @@ with tab1:
     def get_random_flashcard():
         """Get a random flashcard from the database based on current criteria"""
         # Retrieve flashcards based on the selected filters
-        flashcards = filler.db_handler.get_flashcards_by_filters(category_to_practice, status, difficulty)
+        flashcards = filler.db_handler.get_questions_by_filters(category_to_practice, status, difficulty)
         if flashcards:
             return random.choice(flashcards)
         return None
@@ -198,7 +207,8 @@ with tab1:
         if st.session_state.current_flashcard:
             flashcard_id = st.session_state.current_flashcard[0]
             new_status = "known" if knew_it else "unknown"
-            filler.db_handler.update_flashcard_status(flashcard_id, new_status)
+            if not filler.db_handler.read_only:
+                filler.db_handler.update_flashcard_status(flashcard_id, new_status)
             
             # Reset state and get new flashcard
             st.session_state.show_answer = False
@@ -209,7 +219,6 @@ with tab1:
     if st.session_state.current_flashcard:
         flashcard = st.session_state.current_flashcard
         question = flashcard[1]
-        answer = flashcard[2]
         
         # Create a card-like container
         card = st.container()
@@ -221,6 +230,8 @@ with tab1:
                     st.session_state.show_answer = True  # Toggle to show answer
                     st.rerun()
             else:
+                # Answers are fetched on demand, only once the card is flipped
+                answer = filler.db_handler.get_answer(flashcard[0])
                 if st.button(f"Answer: {answer}", use_container_width=True):
                     st.session_state.show_answer = False  # Toggle back to question
                     st.rerun()
@@ -314,7 +325,7 @@ with tab4:
         flashcards_df = pd.DataFrame(flashcards, columns=['id', 'question', 'answer', 'category', 'difficulty', 'status'])
         st.dataframe(flashcards_df, use_container_width=True)
 
-        if filter_status == "known":
+        if filter_status == "known" and not filler.db_handler.read_only:
             # Add "Unbeknownst" button for each row
             for card in flashcards:
                 col1, col2 = st.columns([5, 1])
@@ -0,0 +1,13 @@
+# categories.py
+#
+# Flashcard categories and difficulty levels shared by the app and the generation planner.
+
+CATEGORIES = [
+    "General", "Linear Algebra for Machine Learning", "Bash & Git", "SQL", "Probability & Statistics", "Data Science Fundamentals", 
+    "Machine Learning Fundamentals", "Visualization", "Object Oriented Programming in Python", "Advanced Trees in Machine Learning", "Time Series", "Computer Vision", "Graph Neural Networks", "Backpropagation", 
+    "Databases", "Docker", "Deep Learning", "Streamlit", "NLP", "Transformers", 
+    "Transfer Learning", "LLM Optimization", "Fine Tuning LLMs", "Debugging Deep Learning", 
+    "Vision Transformers", "CV Projects", "Soft Skills"
+]
+
+DIFFICULTIES = ["basic", "intermediate", "advanced"]
@@ -0,0 +1,350 @@
+# compiled_deck.py
+#
+# Compiles a flashcard database into an immutable, memory-mapped deck file for read-only
+# app instances:
+#
+#   python compiled_deck.py flashcards.db flashcards.deck
+#
+# and open it with DatabaseHandler(deck_path="flashcards.deck").
+#
+# File layout (little endian, all sections 8-byte aligned):
+#   magic (8 bytes) | header length (uint64) | JSON header | padding | sections...
+# The JSON header holds the category/difficulty/status tables, the precomputed summary and
+# per-cell counts and the (offset, length) of every section relative to the end of the
+# header. Sections are fixed-width arrays: per-row ids (int64) and category/difficulty/status
+# indices (uint32), question/answer offset tables (uint64, count + 1 entries) with their
+# UTF-8 data, an id lookup (sorted ids + row numbers), the row order by category and
+# question, and one uint32 posting list of row numbers per category and per difficulty.
+# Rows are stored ordered by category, difficulty and id.
+
+import bisect
+import json
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+from array import array
+from typing import List, Optional, Tuple
+
+from db_handler import _resolve_answer
+
+MAGIC = b"DSLDECK1"
+VERSION = 2
+_PREFIX = struct.Struct("<8sQ")
+
+
+def _pad(length: int) -> int:
+    return (-length) % 8
+
+
+def _to_bytes(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def compile_deck(db_name=None, deck_path=None) -> str:
+    """
+    Compile all flashcards of a database into a read-only deck file.
+
+    The source database is opened read-only and is never modified.
+
+    Args:
+        db_name (Optional[str]): Source database (default: flashcards.db next to this module).
+        deck_path (Optional[str]): Output file (default: the database path with a .deck suffix).
+
+    Returns:
+        str: Path of the written deck file.
+
+    Raises:
+        FileNotFoundError: If the source database does not exist.
+        sqlite3.OperationalError: If it has no flashcards table.
+    """
+    if db_name is None:
+        db_name = os.path.join(os.path.dirname(__file__), "flashcards.db")
+    if not os.path.isfile(db_name):
+        raise FileNotFoundError(f"Database not found: {db_name}")
+
+    conn = sqlite3.connect(f"file:{db_name}?mode=ro", uri=True)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        tables = {name for name, in cursor.fetchall()}
+        if "flashcards" not in tables:
+            raise sqlite3.OperationalError(f"{db_name} has no flashcards table")
+
+        # Databases from before compressed answers have no side table
+        if "flashcard_answers" in tables:
+            cursor.execute("""
+                SELECT f.id, f.question, f.answer, f.category, f.difficulty, f.status, a.codec, a.data
+                FROM flashcards f
+                LEFT JOIN flashcard_answers a ON a.flashcard_id = f.id
+            """)
+        else:
+            cursor.execute("""
+                SELECT id, question, answer, category, difficulty, status, NULL, NULL
+                FROM flashcards
+            """)
+        cards = [
+            (row[0], row[1], _resolve_answer(row[2], row[6], row[7])) + tuple(row[3:6])
+            for row in cursor.fetchall()
+        ]
+        cursor.execute("SELECT category, status, COUNT(*) FROM flashcards GROUP BY category, status")
+        summary = cursor.fetchall()
+        cursor.execute("SELECT category, difficulty, COUNT(*) FROM flashcards GROUP BY category, difficulty")
+        counts = cursor.fetchall()
+    finally:
+        conn.close()
+
+    if deck_path is None:
+        deck_path = os.path.splitext(db_name)[0] + ".deck"
+
+    cards = sorted(cards, key=lambda card: (card[3] or "", card[4] or "", card[0]))
+
+    categories, difficulties, statuses = [], [], []
+    lookups = ({}, {}, {})
+
+    def index_of(table, lookup, value):
+        if value not in lookup:
+            lookup[value] = len(table)
+            table.append(value)
+        return lookup[value]
+
+    ids = array("q")
+    category_column, difficulty_column, status_column = array("I"), array("I"), array("I")
+    question_offsets, answer_offsets = array("Q", [0]), array("Q", [0])
+    question_data, answer_data = bytearray(), bytearray()
+    category_postings, difficulty_postings = [], []
+
+    for row, (flashcard_id, question, answer, category, difficulty, status) in enumerate(cards):
+        ids.append(flashcard_id)
+        category_index = index_of(categories, lookups[0], category)
+        difficulty_index = index_of(difficulties, lookups[1], difficulty)
+        category_column.append(category_index)
+        difficulty_column.append(difficulty_index)
+        status_column.append(index_of(statuses, lookups[2], status))
+
+        for postings, index in ((category_postings, category_index), (difficulty_postings, difficulty_index)):
+            if index == len(postings):
+                postings.append(array("I"))
+            postings[index].append(row)
+
+        question_data += (question or "").encode("utf-8")
+        answer_data += (answer or "").encode("utf-8")
+        question_offsets.append(len(question_data))
+        answer_offsets.append(len(answer_data))
+
+    id_order = sorted(range(len(cards)), key=lambda row: ids[row])
+    sorted_ids = array("q", (ids[row] for row in id_order))
+    id_rows = array("I", id_order)
+    # Order of get_all_questions, so readers don't decode and sort every question
+    question_order = array("I", sorted(
+        range(len(cards)), key=lambda row: (cards[row][3] or "", cards[row][1] or "", cards[row][0])))
+
+    sections = {}
+    body = bytearray()
+
+    def add_section(name, data):
+        sections[name] = [len(body), len(data)]
+        body.extend(data)
+        body.extend(b"\0" * _pad(len(data)))
+
+    add_section("ids", _to_bytes(ids))
+    add_section("category", _to_bytes(category_column))
+    add_section("difficulty", _to_bytes(difficulty_column))
+    add_section("status", _to_bytes(status_column))
+    add_section("question_offsets", _to_bytes(question_offsets))
+    add_section("question_data", question_data)
+    add_section("answer_offsets", _to_bytes(answer_offsets))
+    add_section("answer_data", answer_data)
+    add_section("sorted_ids", _to_bytes(sorted_ids))
+    add_section("id_rows", _to_bytes(id_rows))
+    add_section("question_order", _to_bytes(question_order))
+    for index, postings in enumerate(category_postings):
+        add_section(f"category_postings:{index}", _to_bytes(postings))
+    for index, postings in enumerate(difficulty_postings):
+        add_section(f"difficulty_postings:{index}", _to_bytes(postings))
+
+    header = json.dumps({
+        "version": VERSION,
+        "count": len(cards),
+        "categories": categories,
+        "difficulties": difficulties,
+        "statuses": statuses,
+        "summary": [list(entry) for entry in summary],
+        "counts": [list(entry) for entry in counts],
+        "sections": sections,
+    }).encode("utf-8")
+
+    # Write next to the target and rename, so running instances never see a partial file
+    tmp_path = deck_path + ".tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(_PREFIX.pack(MAGIC, len(header)))
+        file.write(header)
+        file.write(b"\0" * _pad(_PREFIX.size + len(header)))
+        file.write(body)
+    os.replace(tmp_path, deck_path)
+    return deck_path
+
+
+class CompiledDeck:
+    """
+    Read-only view of a compiled deck file.
+
+    The file is memory-mapped, so opening it is cheap and instances on the same host share
+    its pages through the OS cache. The query methods mirror the read methods of
+    DatabaseHandler and return the same tuple shapes.
+    """
+
+    def __init__(self, deck_path: str):
+        self.deck_path = deck_path
+        with open(deck_path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buffer = memoryview(self._mmap)
+        self._views = [self._buffer]
+
+        magic, header_length = _PREFIX.unpack_from(self._buffer, 0)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"Not a compiled deck file: {deck_path}")
+        header_end = _PREFIX.size + header_length
+        header = json.loads(bytes(self._buffer[_PREFIX.size:header_end]).decode("utf-8"))
+        if header["version"] != VERSION:
+            self.close()
+            raise ValueError(f"Unsupported deck version {header['version']} in {deck_path}")
+
+        self.count = header["count"]
+        self.categories = header["categories"]
+        self.difficulties = header["difficulties"]
+        self.statuses = header["statuses"]
+        self._summary = [tuple(entry) for entry in header["summary"]]
+        self._counts = [tuple(entry) for entry in header["counts"]]
+        self._base = header_end + _pad(header_end)
+        self._sections = header["sections"]
+
+        self._ids = self._section("ids", "q")
+        self._category = self._section("category", "I")
+        self._difficulty = self._section("difficulty", "I")
+        self._status = self._section("status", "I")
+        self._question_offsets = self._section("question_offsets", "Q")
+        self._question_data = self._section("question_data")
+        self._answer_offsets = self._section("answer_offsets", "Q")
+        self._answer_data = self._section("answer_data")
+        self._sorted_ids = self._section("sorted_ids", "q")
+        self._id_rows = self._section("id_rows", "I")
+        self._question_order = self._section("question_order", "I")
+        self._category_postings = [self._section(f"category_postings:{index}", "I")
+                                   for index in range(len(self.categories))]
+        self._difficulty_postings = [self._section(f"difficulty_postings:{index}", "I")
+                                     for index in range(len(self.difficulties))]
+
+        self._category_index = {category: index for index, category in enumerate(self.categories)}
+        self._difficulty_index = {difficulty: index for index, difficulty in enumerate(self.difficulties)}
+        self._status_index = {status: index for index, status in enumerate(self.statuses)}
+
+    def _section(self, name, typecode=None):
+        offset, length = self._sections[name]
+        start = self._base + offset
+        view = self._buffer[start:start + length]
+        if typecode is not None:
+            if sys.byteorder != "little":
+                # Big endian hosts fall back to a decoded copy instead of a zero-copy view
+                values = array(typecode)
+                values.frombytes(view)
+                values.byteswap()
+                return values
+            view = view.cast(typecode)
+        self._views.append(view)
+        return view
+
+    def _question(self, row: int) -> str:
+        return bytes(self._question_data[self._question_offsets[row]:self._question_offsets[row + 1]]).decode("utf-8")
+
+    def _answer(self, row: int) -> str:
+        return bytes(self._answer_data[self._answer_offsets[row]:self._answer_offsets[row + 1]]).decode("utf-8")
+
+    def _card(self, row: int) -> Tuple:
+        return (
+            self._ids[row],
+            self._question(row),
+            self._answer(row),
+            self.categories[self._category[row]],
+            self.difficulties[self._difficulty[row]],
+            self.statuses[self._status[row]],
+        )
+
+    def _rows(self, category, status=None, difficulty="All") -> List[int]:
+        """Row numbers matching the filters, via the category/difficulty posting lists."""
+        category_index = self._category_index.get(category)
+        if category_index is None:
+            return []
+        rows = self._category_postings[category_index]
+
+        if difficulty != "All":
+            difficulty_index = self._difficulty_index.get(difficulty)
+            if difficulty_index is None:
+                return []
+            # Stays within the category's posting list instead of scanning the whole difficulty
+            rows = [row for row in rows if self._difficulty[row] == difficulty_index]
+
+        if status:
+            status_index = self._status_index.get(status)
+            if status_index is None:
+                return []
+            rows = [row for row in rows if self._status[row] == status_index]
+        return list(rows)
+
+    def _row_of(self, flashcard_id: int) -> Optional[int]:
+        position = bisect.bisect_left(self._sorted_ids, flashcard_id)
+        if position < len(self._sorted_ids) and self._sorted_ids[position] == flashcard_id:
+            return self._id_rows[position]
+        return None
+
+    def get_flashcard(self, flashcard_id: int) -> Optional[Tuple]:
+        row = self._row_of(flashcard_id)
+        return None if row is None else self._card(row)
+
+    def get_answer(self, flashcard_id: int) -> Optional[str]:
+        row = self._row_of(flashcard_id)
+        return None if row is None else self._answer(row)
+
+    def get_questions_by_category(self, category: str, status: Optional[str] = None) -> List[Tuple]:
+        return [(self._ids[row], self._question(row)) for row in self._rows(category, status)]
+
+    def get_flashcards_by_category(self, category: str, status: Optional[str] = None) -> List[Tuple]:
+        return [(self._ids[row], self._question(row), self._answer(row)) for row in self._rows(category, status)]
+
+    def get_questions_by_filters(self, category, status, difficulty) -> List[Tuple]:
+        return [(self._ids[row], self._question(row)) for row in self._rows(category, status, difficulty)]
+
+    def get_flashcards_by_filters(self, category, status, difficulty) -> List[Tuple]:
+        return [self._card(row) for row in self._rows(category, status, difficulty)]
+
+    def get_flashcard_summary(self) -> List[Tuple]:
+        return list(self._summary)
+
+    def get_flashcard_counts(self) -> List[Tuple]:
+        return list(self._counts)
+
+    def get_all_flashcards(self) -> List[Tuple]:
+        return [self._card(row) for row in range(self.count)]
+
+    def get_all_questions(self) -> List[Tuple]:
+        return [(self._ids[row], self._question(row)) for row in self._question_order]
+
+    def close(self):
+        # Views into the mapping must be released before it can be closed
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python compiled_deck.py <flashcards.db> [<output.deck>]")
+        sys.exit(1)
+    path = compile_deck(sys.argv[1], sys.argv[2] if len(sys.argv) == 3 else None)
+    print(f"Compiled deck written to {path}")
@@ -2,17 +2,93 @@
 
 import os
 import sqlite3
+import zlib
 from typing import List, Optional, Tuple
 
+try:
+    import zstandard
+except ImportError:  # zstd is optional, zlib is always available
+    zstandard = None
+
+
+def _compress_answer(answer: str, codec: str) -> bytes:
+    data = answer.encode("utf-8")
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=10).compress(data)
+    return zlib.compress(data, 9)
+
+
+def _decompress_answer(data: bytes, codec: str) -> str:
+    if codec == "zstd":
+        if zstandard is None:
+            raise sqlite3.DatabaseError("Answer is zstd-compressed but the 'zstandard' package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    return zlib.decompress(data).decode("utf-8")
+
+
+def _normalize_codec(codec):
+    """Map a compress_answers value to "zlib", "zstd" or None (plain text)."""
+    if codec is True:
+        codec = "zstd" if zstandard is not None else "zlib"
+    if codec == "zstd" and zstandard is None:
+        raise ValueError("zstd compression requires the 'zstandard' package")
+    if codec not in (False, None, "zlib", "zstd"):
+        raise ValueError(f"Unknown answer codec: {codec}")
+    return codec or None
+
+
+def _resolve_answer(answer, codec, data):
+    """Return the plain answer text, decompressing it from the side table if needed."""
+    if data is not None:
+        return _decompress_answer(data, codec)
+    return answer
+
+
 class DatabaseHandler:
-    def __init__(self, db_name=None):
+    def __init__(self, db_name=None, compress_answers=None, deck_path=None):
+        """
+        Args:
+            db_name (Optional[str]): Path to the SQLite file (default: flashcards.db next to this module).
+            compress_answers (Optional[bool | str]): Store new answers compressed in the
+                `flashcard_answers` side table. Pass "zlib" or "zstd" to pick the codec; True uses
+                zstd when the `zstandard` package is installed and zlib otherwise, False stores
+                plain text. The choice is saved in the database, so later handlers opened with
+                the default (None) keep using it.
+            deck_path (Optional[str]): Serve reads from a deck compiled with compiled_deck.py
+                instead of SQLite. The handler is read-only then: no connection is opened, no
+                DDL runs, and write methods raise sqlite3.OperationalError.
+        """
+        self.deck = None
+        self.read_only = deck_path is not None
+        if self.read_only:
+            from compiled_deck import CompiledDeck
+
+            self.deck = CompiledDeck(deck_path)
+            self.conn = None
+            self.cursor = None
+            self.answer_codec = None
+            return
+
         if db_name is None:
             db_name = os.path.join(os.path.dirname(__file__), "flashcards.db")
 
+        codec = None if compress_answers is None else _normalize_codec(compress_answers)
+
         self.conn = sqlite3.connect(db_name)
         self.cursor = self.conn.cursor()
         self.create_table() 
 
+        if zstandard is None and self._uses_zstd():
+            # Without the package every query that touches a zstd answer would fail
+            self.conn.close()
+            raise sqlite3.DatabaseError(
+                f"{db_name} stores zstd-compressed answers but the 'zstandard' package is not installed")
+
+        if compress_answers is None:
+            self.answer_codec = self._get_setting("answer_codec")
+        else:
+            self.set_answer_codec(codec)
+
     def create_table(self):
         cursor = self.conn.cursor()
         cursor.execute("""
@@ -25,16 +101,202 @@ class DatabaseHandler:
                 status TEXT CHECK(status IN ('unknown', 'known')) DEFAULT 'unknown'
             )
         """)
+        # Compressed answers live in a side table so the main table rows stay narrow
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS flashcard_answers (
+                flashcard_id INTEGER PRIMARY KEY REFERENCES flashcards(id) ON DELETE CASCADE,
+                codec TEXT NOT NULL,
+                data BLOB NOT NULL
+            )
+        """)
+        # Database-wide settings such as the answer codec
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS settings (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            )
+        """)
+        # One row per generate_flashcards call, used to estimate acceptance rates and token costs
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS generation_runs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                category TEXT,
+                difficulty TEXT,
+                attempts INTEGER,
+                responses INTEGER,
+                accepted INTEGER,
+                prompt_tokens INTEGER,
+                completion_tokens INTEGER,
+                duration REAL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        self.conn.commit()
+
+    def _get_setting(self, key: str) -> Optional[str]:
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT value FROM settings WHERE key = ?", (key,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def _uses_zstd(self) -> bool:
+        if self._get_setting("answer_codec") == "zstd":
+            return True
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT 1 FROM flashcard_answers WHERE codec = 'zstd' LIMIT 1")
+        return cursor.fetchone() is not None
+
+    def set_answer_codec(self, codec):
+        """
+        Choose how new and updated answers are stored and save the choice in the database.
+
+        Args:
+            codec (bool | str | None): "zlib", "zstd", True (best available) or False/None (plain text).
+        """
+        self._check_writable()
+        self.answer_codec = _normalize_codec(codec)
+        cursor = self.conn.cursor()
+        cursor.execute("INSERT OR REPLACE INTO settings (key, value) VALUES ('answer_codec', ?)", (self.answer_codec,))
         self.conn.commit()
 
+    def _check_writable(self):
+        if self.read_only:
+            raise sqlite3.OperationalError("attempt to write a readonly database")
+
+    def _store_answer(self, cursor, flashcard_id: int, answer: str):
+        """Write the answer to the side table (compressed) or the main table (plain)."""
+        if self.answer_codec:
+            cursor.execute("""
+                INSERT OR REPLACE INTO flashcard_answers (flashcard_id, codec, data)
+                VALUES (?, ?, ?)
+            """, (flashcard_id, self.answer_codec, _compress_answer(answer, self.answer_codec)))
+            cursor.execute("UPDATE flashcards SET answer = NULL WHERE id = ?", (flashcard_id,))
+        else:
+            cursor.execute("DELETE FROM flashcard_answers WHERE flashcard_id = ?", (flashcard_id,))
+            cursor.execute("UPDATE flashcards SET answer = ? WHERE id = ?", (answer, flashcard_id))
+
     def add_flashcard(self, question: str, answer: str, category: str, difficulty: str):
+        self._check_writable()
         cursor = self.conn.cursor()
         cursor.execute("""
             INSERT INTO flashcards (question, answer, category, difficulty, status)
             VALUES (?, ?, ?, ?, 'unknown')
-        """, (question, answer, category, difficulty))
+        """, (question, None if self.answer_codec else answer, category, difficulty))
+        if self.answer_codec:
+            self._store_answer(cursor, cursor.lastrowid, answer)
         self.conn.commit()
 
+    def get_answer(self, flashcard_id: int) -> Optional[str]:
+        """
+        Fetch the answer of a single flashcard on demand.
+
+        Args:
+            flashcard_id (int): The flashcard id.
+
+        Returns:
+            Optional[str]: The (decompressed) answer text, or None if the id does not exist.
+        """
+        if self.deck is not None:
+            return self.deck.get_answer(flashcard_id)
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT f.answer, a.codec, a.data FROM flashcards f
+            LEFT JOIN flashcard_answers a ON a.flashcard_id = f.id
+            WHERE f.id = ?
+        """, (flashcard_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return _resolve_answer(*row)
+
+    def get_flashcard(self, flashcard_id: int) -> Optional[Tuple]:
+        """
+        Fetch a single flashcard with its answer.
+
+        Returns:
+            Optional[Tuple]: (id, question, answer, category, difficulty, status), or None if the id does not exist.
+        """
+        if self.deck is not None:
+            return self.deck.get_flashcard(flashcard_id)
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT f.id, f.question, f.answer, f.category, f.difficulty, f.status, a.codec, a.data
+            FROM flashcards f
+            LEFT JOIN flashcard_answers a ON a.flashcard_id = f.id
+            WHERE f.id = ?
+        """, (flashcard_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        return (row[0], row[1], _resolve_answer(row[2], row[6], row[7])) + tuple(row[3:6])
+
+    def get_questions_by_category(self, category: str, status: Optional[str] = None) -> List[Tuple]:
+        """
+        Like `get_flashcards_by_category`, but without the answers.
+
+        Returns:
+            List[Tuple]: List of (id, question) tuples. Use `get_answer` to load an answer.
+        """
+        if self.deck is not None:
+            return self.deck.get_questions_by_category(category, status)
+        cursor = self.conn.cursor()
+        if status:
+            cursor.execute("""
+                SELECT id, question FROM flashcards
+                WHERE category = ? AND status = ?
+            """, (category, status))
+        else:
+            cursor.execute("""
+                SELECT id, question FROM flashcards
+                WHERE category = ?
+            """, (category,))
+        return cursor.fetchall()
+
+    def get_questions_by_filters(self, category, status, difficulty) -> List[Tuple]:
+        """
+        Like `get_flashcards_by_filters`, but without the answers.
+
+        Returns:
+            List[Tuple]: List of (id, question) tuples. Use `get_answer` to load an answer.
+        """
+        if self.deck is not None:
+            return self.deck.get_questions_by_filters(category, status, difficulty)
+        query = "SELECT id, question FROM flashcards WHERE category = ? AND status = ?"
+        params = [category, status]
+
+        if difficulty != "All":
+            query += " AND difficulty = ?"
+            params.append(difficulty)
+
+        cursor = self.conn.cursor()
+        cursor.execute(query, params)
+        return cursor.fetchall()
+
+    def compress_existing_answers(self, codec=True, vacuum: bool = True) -> int:
+        """
+        Switch the database to compressed answers and move all plain-text answers into the side table.
+
+        Args:
+            codec (bool | str): "zlib", "zstd" or True (best available). Saved with `set_answer_codec`,
+                so every handler opened on this database keeps storing answers compressed.
+            vacuum (bool): Run VACUUM afterwards so the database file actually shrinks.
+
+        Returns:
+            int: Number of answers that were compressed.
+        """
+        if not codec:
+            raise ValueError("compress_existing_answers needs a codec")
+        self.set_answer_codec(codec)
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id, answer FROM flashcards WHERE answer IS NOT NULL")
+        rows = cursor.fetchall()
+        for flashcard_id, answer in rows:
+            self._store_answer(cursor, flashcard_id, answer)
+        self.conn.commit()
+        if vacuum:
+            self.conn.execute("VACUUM")
+        return len(rows)
+
     def get_flashcards_by_category(self, category: str, status: str = "unknown") -> List[Tuple]:
         cursor = self.conn.cursor()
         cursor.execute("""
@@ -44,6 +306,7 @@ class DatabaseHandler:
         return cursor.fetchall()
 
     def update_flashcard_status(self, flashcard_id: int, status: str):
+        self._check_writable()
         cursor = self.conn.cursor()
         cursor.execute("""
             UPDATE flashcards SET status = ? WHERE id = ?
@@ -51,6 +314,8 @@ class DatabaseHandler:
         self.conn.commit()
 
     def get_flashcard_summary(self):
+        if self.deck is not None:
+            return self.deck.get_flashcard_summary()
         self.cursor.execute("SELECT category, status, COUNT(*) FROM flashcards GROUP BY category, status")
         return self.cursor.fetchall()
     
@@ -65,33 +330,89 @@ class DatabaseHandler:
         Returns:
             List[Tuple]: List of tuples containing flashcard information.
         """
+        if self.deck is not None:
+            return self.deck.get_flashcards_by_category(category, status)
         cursor = self.conn.cursor()
+        query = """
+            SELECT f.id, f.question, f.answer, a.codec, a.data FROM flashcards f
+            LEFT JOIN flashcard_answers a ON a.flashcard_id = f.id
+            WHERE f.category = ?
+        """
+        params = [category]
         if status:
-            cursor.execute("""
-                SELECT id, question, answer FROM flashcards
-                WHERE category = ? AND status = ?
-            """, (category, status))
-        else:
-            cursor.execute("""
-                SELECT id, question, answer FROM flashcards
-                WHERE category = ?
-            """, (category,))
+            query += " AND f.status = ?"
+            params.append(status)
+        cursor.execute(query, params)
+        return [(row[0], row[1], _resolve_answer(*row[2:])) for row in cursor.fetchall()]
+
+
+    def get_flashcard_counts(self) -> List[Tuple]:
+        """
+        Returns:
+            List[Tuple]: (category, difficulty, count) tuples.
+        """
+        if self.deck is not None:
+            return self.deck.get_flashcard_counts()
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT category, difficulty, COUNT(*) FROM flashcards GROUP BY category, difficulty")
         return cursor.fetchall()
 
+    def log_generation_run(self, category, difficulty, attempts, responses, accepted, prompt_tokens,
+                           completion_tokens, duration):
+        """
+        Args:
+            attempts (int): LLM requests made.
+            responses (int): Requests that returned a completion (failed requests use no tokens).
+        """
+        self._check_writable()
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            INSERT INTO generation_runs (category, difficulty, attempts, responses, accepted, prompt_tokens,
+                                         completion_tokens, duration)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (category, difficulty, attempts, responses, accepted, prompt_tokens, completion_tokens, duration))
+        self.conn.commit()
+
+    def get_generation_stats(self) -> List[Tuple]:
+        """
+        Aggregate the logged generation runs.
+
+        Returns:
+            List[Tuple]: (category, difficulty, attempts, responses, accepted, prompt_tokens, completion_tokens,
+                duration) tuples, summed per category and difficulty. Empty for compiled decks.
+        """
+        if self.deck is not None:
+            return []
+        cursor = self.conn.cursor()
+        cursor.execute("""
+            SELECT category, difficulty, SUM(attempts), SUM(responses), SUM(accepted), SUM(prompt_tokens),
+                   SUM(completion_tokens), SUM(duration)
+            FROM generation_runs
+            GROUP BY category, difficulty
+        """)
+        return cursor.fetchall()
 
     def get_all_flashcards(self):
+        if self.deck is not None:
+            return self.deck.get_all_flashcards()
         try:
             self.cursor.execute('''
-                SELECT id, question, answer, category, difficulty, status
-                FROM flashcards 
-                ORDER BY category, difficulty
+                SELECT f.id, f.question, f.answer, f.category, f.difficulty, f.status, a.codec, a.data
+                FROM flashcards f
+                LEFT JOIN flashcard_answers a ON a.flashcard_id = f.id
+                ORDER BY f.category, f.difficulty
             ''')
-            return self.cursor.fetchall()
+            return [
+                (row[0], row[1], _resolve_answer(row[2], row[6], row[7])) + tuple(row[3:6])
+                for row in self.cursor.fetchall()
+            ]
         except sqlite3.Error as e:
             print(f"Error retrieving flashcards: {e}")
             return []
         
     def get_all_questions(self):
+        if self.deck is not None:
+            return self.deck.get_all_questions()
         try:
             self.cursor.execute('''
                 SELECT id, question
@@ -105,11 +426,16 @@ class DatabaseHandler:
 
     def update_flashcard(self, flashcard_id, question, answer, category, difficulty):
         try:
+            self._check_writable()
             self.cursor.execute('''
                 UPDATE flashcards 
-                SET question = ?, answer = ?, category = ?, difficulty = ? 
+                SET question = ?, category = ?, difficulty = ? 
                 WHERE id = ?
-            ''', (question, answer, category, difficulty, flashcard_id))
+            ''', (question, category, difficulty, flashcard_id))
+            if self.cursor.rowcount == 0:
+                # Unknown id: don't leave an orphan row in flashcard_answers
+                return False
+            self._store_answer(self.cursor, flashcard_id, answer)
             self.conn.commit()
             return True
         except sqlite3.Error as e:
@@ -117,18 +443,29 @@ class DatabaseHandler:
             return False
         
     def get_flashcards_by_filters(self, category, status, difficulty):
-        query = "SELECT * FROM flashcards WHERE category = ? AND status = ?"
+        if self.deck is not None:
+            return self.deck.get_flashcards_by_filters(category, status, difficulty)
+        query = """
+            SELECT f.id, f.question, f.answer, f.category, f.difficulty, f.status, a.codec, a.data
+            FROM flashcards f
+            LEFT JOIN flashcard_answers a ON a.flashcard_id = f.id
+            WHERE f.category = ? AND f.status = ?
+        """
         params = [category, status]
         
         if difficulty != "All":
-            query += " AND difficulty = ?"
+            query += " AND f.difficulty = ?"
             params.append(difficulty)
         
         self.cursor.execute(query, params)
-        return self.cursor.fetchall()
+        return [
+            (row[0], row[1], _resolve_answer(row[2], row[6], row[7])) + tuple(row[3:6])
+            for row in self.cursor.fetchall()
+        ]
         
         # In db_handler.py or equivalent file
     def update_flashcard_status(self, flashcard_id, status="unknown"):
+        self._check_writable()
         query = "UPDATE flashcards SET status = ? WHERE id = ?"
         self.cursor.execute(query, (status, flashcard_id))
         self.conn.commit()
@@ -136,6 +473,8 @@ class DatabaseHandler:
 
     def delete_flashcard(self, flashcard_id):
         try:
+            self._check_writable()
+            self.cursor.execute('DELETE FROM flashcard_answers WHERE flashcard_id = ?', (flashcard_id,))
             self.cursor.execute('DELETE FROM flashcards WHERE id = ?', (flashcard_id,))
             self.conn.commit()
             return True
@@ -144,7 +483,10 @@ class DatabaseHandler:
             return False
 
     def close(self):
-        self.conn.close()
+        if self.deck is not None:
+            self.deck.close()
+        else:
+            self.conn.close()
 
 
 #db_handler = DatabaseHandler()
\ No newline at end of file
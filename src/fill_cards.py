@@ -1,99 +1,140 @@
-import openai
 import os
+import time
 from db_handler import DatabaseHandler
-import json
+from llm_backend import LLMBackendError, OpenAIBackend
 
-# Load config.json
-with open("config.json", "r") as file:
-    config = json.load(file)
 
-# Access the API key
-openai_api_key = config["openai"]["api_key"]
+def parse_flashcard_response(response_text):
+    """
+    Split an LLM reply of the form "Question: ... Answer: ..." into question and answer.
+
+    Raises:
+        ValueError: If the reply is not in the expected format or too short.
+    """
+    if "Question:" not in response_text or "Answer:" not in response_text:
+        raise ValueError("Response not in expected format")
+
+    # Split into question and answer
+    parts = response_text.split("Question:", 1)
+    qa_text = parts[1] if len(parts) > 1 else parts[0]
+
+    question_answer = qa_text.split("Answer:", 1)
+    if len(question_answer) != 2:
+        raise ValueError("Could not separate question and answer")
+
+    question = question_answer[0].strip()
+    answer = question_answer[1].strip()
+
+    # Validate content
+    if not question or not answer:
+        raise ValueError("Empty question or answer")
+
+    # Check for minimum length and complexity
+    if len(question) < 15 or len(answer) < 20:
+        raise ValueError("Question or answer too short")
+
+    return question, answer
+
 
 class FlashcardGenerator:
-    def __init__(self, db_name=None):
-        self.db_handler = DatabaseHandler(db_name)
+    # max_tokens of a generate_flashcards request
+    generation_max_tokens = 400
+
+    def __init__(self, db_name=None, backend=None, deck_path=None):
+        """
+        Args:
+            db_name (Optional[str]): Path to the flashcard database.
+            backend (Optional[LLMBackend]): Completion backend (default: OpenAIBackend with gpt-3.5-turbo).
+                Use RecordReplayBackend or an OpenAIBackend pointed at llm_stub_server.py for offline runs.
+            deck_path (Optional[str]): Open a compiled deck read-only instead of the database.
+        """
+        self.db_handler = DatabaseHandler(db_name, deck_path=deck_path)
+        self.backend = backend if backend is not None else OpenAIBackend()
+        self.last_run = None
 
-    def generate_flashcards(self, category, difficulty, num_flashcards=5):
+    def build_generation_prompt(self, category, difficulty, generated_questions):
+        """Chat messages asking for one new flashcard that differs from `generated_questions`."""
+        return [
+            {
+                "role": "user",
+                "content": (
+                    f"Generate a unique and specific flashcard on the topic '{category}' "
+                    f"with a difficulty level of {difficulty}. Ensure the question is distinct "
+                    f"from these previously generated questions: {sorted(generated_questions)}.\n\n"
+                    "Format your response as follows:\n"
+                    "Question: [Insert your unique, specific machine learning question here]\n"
+                    "Answer: [Provide a detailed, precise answer here]"
+                )
+            },
+            {
+                "role": "system",
+                "content": (
+                    "Ensure the question is both unique and detailed. Avoid overly broad questions. If math is involved, you can add examples in the question and add the answer in the answer section."
+                    "For example, instead of asking 'What is overfitting?', ask "
+                    "'How does adding dropout layers mitigate overfitting in neural networks, and what is the trade-off?'"
+                )
+            }
+        ]
+
+    def generate_flashcards(self, category, difficulty, num_flashcards=5, max_attempts=None, max_tokens=None):
         """
-        Generate unique flashcards for a given topic and difficulty using OpenAI.
+        Generate unique flashcards for a given topic and difficulty using the LLM backend.
         
         Args:
             category (str): The topic category for the flashcards
             difficulty (str): The difficulty level (e.g., "easy", "medium", "hard")
             num_flashcards (int): Number of unique flashcards to generate (default: 5)
+            max_attempts (Optional[int]): Cap on LLM requests (default: num_flashcards * 2)
+            max_tokens (Optional[int]): Token budget (prompt + completion). No request is started
+                once the next one could exceed it, counting its completion at the full
+                `generation_max_tokens`. The prompt size is estimated until the first response.
             
         Returns:
-            int: Number of successfully generated unique flashcards
+            int: Number of successfully generated unique flashcards. Attempts, token usage
+                and duration of the run are kept in `last_run` and logged to the database.
         """
         successful_cards = 0
         generated_questions = {question for _, question in self.db_handler.get_all_questions()}
-        max_attempts = num_flashcards * 2  # Allow for some retry attempts
+        if max_attempts is None:
+            max_attempts = num_flashcards * 2  # Allow for some retry attempts
         attempt_count = 0
+        response_count = 0
+        last_prompt_tokens = 0
+        prompt_tokens = 0
+        completion_tokens = 0
+        start_time = time.perf_counter()
         
         try:
             while successful_cards < num_flashcards and attempt_count < max_attempts:
-                try:
-                    # Format the prompt to explicitly request unique content
-                    prompt = [
-                        {
-                            "role": "user",
-                            "content": (
-                                f"Generate a unique and specific flashcard on the topic '{category}' "
-                                f"with a difficulty level of {difficulty}. Ensure the question is distinct "
-                                f"from these previously generated questions: {list(generated_questions)}.\n\n"
-                                "Format your response as follows:\n"
-                                "Question: [Insert your unique, specific machine learning question here]\n"
-                                "Answer: [Provide a detailed, precise answer here]"
-                            )
-                        },
-                        {
-                            "role": "system",
-                            "content": (
-                                "Ensure the question is both unique and detailed. Avoid overly broad questions. If math is involved, you can add examples in the question and add the answer in the answer section."
-                                "For example, instead of asking 'What is overfitting?', ask "
-                                "'How does adding dropout layers mitigate overfitting in neural networks, and what is the trade-off?'"
-                            )
-                        }
-                    ]
+                # Format the prompt to explicitly request unique content
+                prompt = self.build_generation_prompt(category, difficulty, generated_questions)
 
+                if max_tokens is not None:
+                    # The prompt only grows, so the last one (or ~4 characters per token before the
+                    # first response) plus the completion cap bounds the next request
+                    prompt_estimate = max(last_prompt_tokens, sum(len(m["content"]) for m in prompt) // 4)
+                    expected_tokens = prompt_estimate + self.generation_max_tokens
+                    if prompt_tokens + completion_tokens + expected_tokens > max_tokens:
+                        print(f"Token budget of {max_tokens} used up")
+                        break
 
+                try:
                     # Make API call with higher temperature for more variety
-                    response = openai.chat.completions.create(
-                        model="gpt-3.5-turbo",
-                        messages=prompt,
-                        max_tokens=400,
+                    response = self.backend.complete(
+                        prompt,
+                        max_tokens=self.generation_max_tokens,
                         temperature=0.7,  # Higher temperature for more variety
                         presence_penalty=0.5,  # Encourage unique content
                         frequency_penalty=0.5,  # Discourage repetition
                         n=1
                     )
+                    response_count += 1
+                    last_prompt_tokens = response.prompt_tokens
+                    prompt_tokens += response.prompt_tokens
+                    completion_tokens += response.completion_tokens
 
-                    # Extract response text
-                    response_text = response.choices[0].message.content.strip()
-
-                    # Parse response
-                    if "Question:" not in response_text or "Answer:" not in response_text:
-                        raise ValueError("Response not in expected format")
-
-                    # Split into question and answer
-                    parts = response_text.split("Question:", 1)
-                    qa_text = parts[1] if len(parts) > 1 else parts[0]
-                    
-                    question_answer = qa_text.split("Answer:", 1)
-                    if len(question_answer) != 2:
-                        raise ValueError("Could not separate question and answer")
-
-                    question = question_answer[0].strip()
-                    answer = question_answer[1].strip()
-
-                    # Validate content
-                    if not question or not answer:
-                        raise ValueError("Empty question or answer")
-                    
-                    # Check for minimum length and complexity
-                    if len(question) < 15 or len(answer) < 20:
-                        raise ValueError("Question or answer too short")
+                    # Extract response text and parse it
+                    question, answer = parse_flashcard_response(response.text.strip())
 
                     # Check uniqueness
                     question_key = question.lower()
@@ -109,8 +150,8 @@ class FlashcardGenerator:
                     print(f"Q: {question}")
                     print(f"A: {answer}\n")
 
-                except openai.OpenAIError as e:
-                    print(f"OpenAI API error: {str(e)}")
+                except LLMBackendError as e:
+                    print(f"LLM backend error: {str(e)}")
                 except ValueError as e:
                     print(f"Validation error: {str(e)}")
                 except Exception as e:
@@ -128,12 +169,26 @@ class FlashcardGenerator:
             return successful_cards
         
         finally:
-            # If you want to ensure some cleanup happens
-            pass
+            # Record the run so the generation planner can estimate yield and cost
+            self.last_run = {
+                "category": category,
+                "difficulty": difficulty,
+                "attempts": attempt_count,
+                "responses": response_count,
+                "accepted": successful_cards,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "duration": time.perf_counter() - start_time,
+            }
+            if attempt_count:
+                try:
+                    self.db_handler.log_generation_run(**self.last_run)
+                except Exception as e:
+                    print(f"Error logging generation run: {str(e)}")
 
     def generate_flashcard_from_question(self, question, category, difficulty):
         """
-        Generate a flashcard based on a predefined question and use OpenAI to get an answer.
+        Generate a flashcard based on a predefined question and use the LLM backend to get an answer.
         
         Args:
             question (str): The predefined question to generate a flashcard for.
@@ -144,7 +199,7 @@ class FlashcardGenerator:
             bool: True if the flashcard was successfully generated and stored, False otherwise.
         """
         try:
-            # Format the prompt for OpenAI to answer the provided question
+            # Format the prompt for the LLM to answer the provided question
             prompt = [
                 {
                     "role": "user",
@@ -178,15 +233,14 @@ class FlashcardGenerator:
                     ]
 
             # Make API call
-            response = openai.chat.completions.create(
-                        model="gpt-3.5-turbo",
-                        messages=prompt,
+            response = self.backend.complete(
+                        prompt,
                         max_tokens=500,
                         temperature=0.3
                     )
 
             # Extract response text
-            response_text = response.choices[0].message.content.strip()
+            response_text = response.text.strip()
 
             # Validate response format
             if "Answer:" not in response_text:
@@ -205,8 +259,8 @@ class FlashcardGenerator:
             print(f"Generated flashcard for predefined question:\nQ: {question}\nA: {answer}\n")
             return answer
 
-        except openai.OpenAIError as e:
-            print(f"OpenAI API error: {str(e)}")
+        except LLMBackendError as e:
+            print(f"LLM backend error: {str(e)}")
         except ValueError as e:
             print(f"Validation error: {str(e)}")
         except Exception as e:
@@ -0,0 +1,250 @@
+# generation_planner.py
+#
+# Decides what to generate: finds the category/difficulty cells where the deck is thinnest,
+# spends a global request/token budget where it buys the most new cards, runs the plan
+# through FlashcardGenerator and reports cards per dollar and per minute.
+#
+#   python generation_planner.py --target 10 --max-requests 40 --max-tokens 200000
+#   python generation_planner.py --dry-run --categories "SQL" "Docker" "Time Series"
+
+import argparse
+import heapq
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from categories import CATEGORIES, DIFFICULTIES
+
+# USD per 1K tokens (gpt-3.5-turbo)
+PROMPT_PRICE = 0.0005
+COMPLETION_PRICE = 0.0015
+
+PRIOR_STRENGTH = 2
+
+
+def estimate_tokens(characters: int) -> int:
+    # Roughly 4 characters per token for English text
+    return characters // 4
+
+
+@dataclass
+class PlanItem:
+    category: str
+    difficulty: str
+    gap: int
+    requests: int
+    expected_cards: float
+    estimated_tokens: int
+
+
+class GenerationPlanner:
+    def __init__(self, generator, categories=None, difficulties=tuple(DIFFICULTIES), target_per_cell=10,
+                 prompt_price=PROMPT_PRICE, completion_price=COMPLETION_PRICE):
+        """
+        Args:
+            generator (FlashcardGenerator): Used to read deck statistics and to execute plans.
+            categories (Optional[List[str]]): Categories to plan for (default: CATEGORIES plus any
+                other category already in the deck).
+            difficulties (Tuple[str]): Difficulty levels to plan for.
+            target_per_cell (int): Desired number of cards per category and difficulty.
+            prompt_price (float): USD per 1K prompt tokens.
+            completion_price (float): USD per 1K completion tokens.
+        """
+        self.generator = generator
+        self.db_handler = generator.db_handler
+        self.categories = categories
+        self.difficulties = difficulties
+        self.target_per_cell = target_per_cell
+        self.prompt_price = prompt_price
+        self.completion_price = completion_price
+
+    def _cell_estimates(self) -> Dict[Tuple[str, str], dict]:
+        """Current count, gap, acceptance rate and tokens per request for every planned cell."""
+        counts = {(category, difficulty): count for category, difficulty, count in self.db_handler.get_flashcard_counts()}
+        history = {(row[0], row[1]): row[2:] for row in self.db_handler.get_generation_stats()}
+        existing_questions = {question for _, question in self.db_handler.get_all_questions()}
+        # Only the category and difficulty differ between the cells' prompts, so build it once
+        base_prompt = self.generator.build_generation_prompt("", "", existing_questions)
+        base_characters = sum(len(message["content"]) for message in base_prompt)
+
+        total_attempts = sum(stats[0] or 0 for stats in history.values())
+        total_accepted = sum(stats[2] or 0 for stats in history.values())
+        global_rate = (total_accepted + 1) / (total_attempts + 2)
+
+        categories = self.categories
+        if categories is None:
+            extra = sorted({category for category, _ in counts if category is not None} - set(CATEGORIES))
+            categories = list(CATEGORIES) + extra
+
+        cells = {}
+        for category in categories:
+            for difficulty in self.difficulties:
+                count = counts.get((category, difficulty), 0)
+                attempts, responses, accepted, prompt_tokens, completion_tokens, _ = history.get(
+                    (category, difficulty), (0, 0, 0, 0, 0, 0))
+                attempts, responses, accepted = attempts or 0, responses or 0, accepted or 0
+                tokens = (prompt_tokens or 0) + (completion_tokens or 0)
+
+                # Every prompt lists all existing questions, so it only grows over time: the
+                # current prompt size is a lower bound even for cells with history. Failed
+                # requests use no tokens and are left out of the per-request average.
+                prompt_estimate = estimate_tokens(base_characters + len(category) + len(difficulty))
+                if responses:
+                    tokens_per_request = max(tokens / responses, prompt_estimate)
+                else:
+                    tokens_per_request = prompt_estimate + self.generator.generation_max_tokens
+
+                cells[(category, difficulty)] = {
+                    "count": count,
+                    "gap": max(self.target_per_cell - count, 0),
+                    # Shrink the cell's own rate towards the global one while it has little history
+                    "acceptance_rate": (accepted + PRIOR_STRENGTH * global_rate) / (attempts + PRIOR_STRENGTH),
+                    "tokens_per_request": tokens_per_request,
+                }
+        return cells
+
+    def plan(self, max_requests: int, max_tokens: Optional[int] = None) -> List[PlanItem]:
+        """
+        Allocate the request/token budget to category/difficulty cells.
+
+        Requests are handed out one at a time to the cell with the most expected new cards
+        per token, weighted by how much of its gap is still open. Each request is expected
+        to close the gap by the cell's acceptance rate.
+
+        Args:
+            max_requests (int): Total LLM requests to spend.
+            max_tokens (Optional[int]): Total (estimated) tokens to spend.
+
+        Returns:
+            List[PlanItem]: One item per cell that received requests, largest allocation first.
+        """
+        cells = self._cell_estimates()
+
+        def priority(cell, remaining):
+            expected = min(cell["acceptance_rate"], remaining)
+            return expected * (remaining / self.target_per_cell) / cell["tokens_per_request"]
+
+        heap = []
+        remaining_gap = {}
+        for key, cell in cells.items():
+            if cell["gap"] > 0:
+                remaining_gap[key] = cell["gap"]
+                heapq.heappush(heap, (-priority(cell, cell["gap"]), key))
+
+        allocation = {}
+        requests_left = max_requests
+        tokens_left = max_tokens if max_tokens is not None else math.inf
+        while heap and requests_left > 0:
+            _, key = heapq.heappop(heap)
+            cell = cells[key]
+            if cell["tokens_per_request"] > tokens_left:
+                continue  # Too expensive for what is left, cheaper cells may still fit
+
+            allocation[key] = allocation.get(key, 0) + 1
+            requests_left -= 1
+            tokens_left -= cell["tokens_per_request"]
+            remaining_gap[key] -= cell["acceptance_rate"]
+            if remaining_gap[key] > 0:
+                heapq.heappush(heap, (-priority(cell, remaining_gap[key]), key))
+
+        plan = []
+        for (category, difficulty), requests in allocation.items():
+            cell = cells[(category, difficulty)]
+            plan.append(PlanItem(
+                category=category,
+                difficulty=difficulty,
+                gap=cell["gap"],
+                requests=requests,
+                expected_cards=min(requests * cell["acceptance_rate"], cell["gap"]),
+                estimated_tokens=round(requests * cell["tokens_per_request"]),
+            ))
+        plan.sort(key=lambda item: item.requests, reverse=True)
+        return plan
+
+    def execute(self, plan: List[PlanItem], max_tokens: Optional[int] = None) -> dict:
+        """
+        Run a plan through the FlashcardGenerator.
+
+        Each cell generates up to its gap and stops early once the gap is filled, so
+        unused requests are not spent.
+
+        Args:
+            plan (List[PlanItem]): The plan to run.
+            max_tokens (Optional[int]): Hard token budget, counted from the actual usage of each
+                run. A cell gets at most what is left and execution stops once it is used up.
+
+        Returns:
+            dict: Totals for cards, requests, tokens, cost (USD), minutes, cards_per_dollar
+                and cards_per_minute (None where the denominator is zero).
+        """
+        report = {"cards": 0, "requests": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        start_time = time.perf_counter()
+
+        for item in plan:
+            tokens_left = None
+            if max_tokens is not None:
+                tokens_left = max_tokens - report["prompt_tokens"] - report["completion_tokens"]
+                if tokens_left < item.estimated_tokens / item.requests:
+                    print(f"Token budget of {max_tokens} used up, skipping the rest of the plan")
+                    break
+
+            print(f"Generating {item.category} / {item.difficulty}: up to {item.gap} cards in {item.requests} requests")
+            self.generator.generate_flashcards(
+                item.category, item.difficulty, num_flashcards=item.gap, max_attempts=item.requests,
+                max_tokens=tokens_left)
+            run = self.generator.last_run or {}
+            report["cards"] += run.get("accepted", 0)
+            report["requests"] += run.get("attempts", 0)
+            report["prompt_tokens"] += run.get("prompt_tokens", 0)
+            report["completion_tokens"] += run.get("completion_tokens", 0)
+
+        report["minutes"] = (time.perf_counter() - start_time) / 60
+        report["cost"] = (report["prompt_tokens"] * self.prompt_price
+                          + report["completion_tokens"] * self.completion_price) / 1000
+        report["cards_per_dollar"] = report["cards"] / report["cost"] if report["cost"] else None
+        report["cards_per_minute"] = report["cards"] / report["minutes"] if report["minutes"] else None
+        return report
+
+
+def print_plan(plan: List[PlanItem]):
+    print(f"{'Category':<40} {'Difficulty':<13} {'Gap':>4} {'Requests':>9} {'Exp. cards':>11} {'Est. tokens':>12}")
+    for item in plan:
+        print(f"{item.category:<40} {item.difficulty:<13} {item.gap:>4} {item.requests:>9} "
+              f"{item.expected_cards:>11.1f} {item.estimated_tokens:>12}")
+    print(f"Total: {sum(item.requests for item in plan)} requests, "
+          f"{sum(item.expected_cards for item in plan):.1f} expected cards, "
+          f"{sum(item.estimated_tokens for item in plan)} estimated tokens")
+
+
+def print_report(report: dict):
+    print(f"Generated {report['cards']} cards with {report['requests']} requests in {report['minutes']:.2f} min")
+    print(f"Tokens: {report['prompt_tokens']} prompt, {report['completion_tokens']} completion, cost ${report['cost']:.4f}")
+    if report["cards_per_dollar"] is not None:
+        print(f"Cards per dollar: {report['cards_per_dollar']:.1f}")
+    if report["cards_per_minute"] is not None:
+        print(f"Cards per minute: {report['cards_per_minute']:.2f}")
+
+
+if __name__ == "__main__":
+    from fill_cards import FlashcardGenerator
+    from llm_backend import OpenAIBackend
+
+    parser = argparse.ArgumentParser(description="Plan and run flashcard generation within a budget")
+    parser.add_argument("--max-requests", type=int, default=30)
+    parser.add_argument("--max-tokens", type=int, default=None)
+    parser.add_argument("--target", type=int, default=10, help="Desired cards per category and difficulty")
+    parser.add_argument("--categories", nargs="+", default=None)
+    parser.add_argument("--difficulties", nargs="+", default=DIFFICULTIES)
+    parser.add_argument("--db", default=None, help="Database path (default: src/flashcards.db)")
+    parser.add_argument("--base-url", default=None, help="OpenAI-compatible endpoint, e.g. llm_stub_server.py")
+    parser.add_argument("--dry-run", action="store_true", help="Only print the plan")
+    args = parser.parse_args()
+
+    generator = FlashcardGenerator(args.db, backend=OpenAIBackend(base_url=args.base_url))
+    planner = GenerationPlanner(generator, args.categories, tuple(args.difficulties), args.target)
+    plan = planner.plan(args.max_requests, args.max_tokens)
+    print_plan(plan)
+    if not args.dry_run and plan:
+        print_report(planner.execute(plan, args.max_tokens))
+    generator.close()
@@ -0,0 +1,177 @@
+# llm_backend.py
+
+import hashlib
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+
+class LLMBackendError(Exception):
+    """Raised when a backend cannot produce a completion (API error, missing recording, ...)."""
+
+
+@dataclass
+class LLMResponse:
+    text: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
+def load_api_key(config_path: str = "config.json") -> Optional[str]:
+    """
+    Read the OpenAI API key from config.json, falling back to the OPENAI_API_KEY environment variable.
+    """
+    if os.path.exists(config_path):
+        with open(config_path, "r") as file:
+            config = json.load(file)
+        return config["openai"]["api_key"]
+    return os.environ.get("OPENAI_API_KEY")
+
+
+class LLMBackend(ABC):
+    """Interface for chat completion backends used by FlashcardGenerator."""
+
+    model = None
+
+    @abstractmethod
+    def complete(self, messages: List[Dict], **params) -> LLMResponse:
+        """
+        Run a chat completion.
+
+        Args:
+            messages (List[Dict]): OpenAI-style chat messages.
+            **params: Sampling parameters (max_tokens, temperature, presence_penalty, ...).
+
+        Returns:
+            LLMResponse: The completion text and token usage.
+        """
+
+
+class OpenAIBackend(LLMBackend):
+    def __init__(self, model="gpt-3.5-turbo", api_key=None, base_url=None, config_path="config.json",
+                 timeout=60.0, max_retries=2):
+        """
+        Args:
+            model (str): Chat model name.
+            api_key (Optional[str]): API key (default: read from config.json / OPENAI_API_KEY).
+            base_url (Optional[str]): Endpoint of an OpenAI-compatible server, e.g. the stub
+                from llm_stub_server.py ("http://127.0.0.1:8000/v1").
+            config_path (str): Where to look for the API key.
+            timeout (float): Request timeout in seconds.
+            max_retries (int): Retries done by the OpenAI client on rate limits and server errors.
+        """
+        self.model = model
+        self.api_key = api_key
+        self.base_url = base_url
+        self.config_path = config_path
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._client = None
+
+    @property
+    def client(self):
+        # The client (and the API key) are only needed once the first request is made
+        if self._client is None:
+            import openai
+
+            api_key = self.api_key or load_api_key(self.config_path)
+            if api_key is None and self.base_url is not None:
+                api_key = "stub"  # local OpenAI-compatible servers don't check the key
+            self._client = openai.OpenAI(api_key=api_key, base_url=self.base_url,
+                                         timeout=self.timeout, max_retries=self.max_retries)
+        return self._client
+
+    def complete(self, messages, **params):
+        import openai
+
+        try:
+            response = self.client.chat.completions.create(model=self.model, messages=messages, **params)
+        except openai.OpenAIError as e:
+            raise LLMBackendError(f"OpenAI API error: {str(e)}") from e
+
+        usage = response.usage
+        return LLMResponse(
+            text=response.choices[0].message.content or "",
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+        )
+
+
+class RecordReplayBackend(LLMBackend):
+    """
+    Records completions of another backend to a JSONL file, or replays them without network access.
+
+    Requests are keyed by a hash of the messages and parameters, so use one recording file per
+    model. Repeated identical requests are replayed in the order they were recorded.
+    """
+
+    def __init__(self, path, backend: Optional[LLMBackend] = None, mode="replay"):
+        """
+        Args:
+            path (str): JSONL recording file.
+            backend (Optional[LLMBackend]): The backend to record from (required for mode="record").
+            mode (str): "record" to call `backend` and append to `path`, "replay" to serve from `path`.
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown mode: {mode}")
+        if mode == "record" and backend is None:
+            raise ValueError("Recording requires a backend")
+
+        self.path = path
+        self.backend = backend
+        self.mode = mode
+        self.model = backend.model if backend is not None else None
+        self._recordings = {}
+        self._cursors = {}
+        self._lock = threading.Lock()
+
+        if mode == "replay":
+            if not os.path.exists(path):
+                raise LLMBackendError(f"Recording file not found: {path}")
+            with open(path, "r", encoding="utf-8") as file:
+                for line in file:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._recordings.setdefault(entry["key"], []).append(entry)
+                        self.model = entry.get("model", self.model)
+
+    def _request_key(self, messages, params):
+        payload = json.dumps({"messages": messages, "params": params}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def complete(self, messages, **params):
+        key = self._request_key(messages, params)
+
+        if self.mode == "record":
+            try:
+                response = self.backend.complete(messages, **params)
+                entry = {"key": key, "model": self.model, "text": response.text, "prompt_tokens": response.prompt_tokens,
+                         "completion_tokens": response.completion_tokens}
+            except LLMBackendError as e:
+                # Failures are recorded too, so retry behavior replays faithfully
+                response = None
+                entry = {"key": key, "model": self.model, "error": str(e)}
+            with self._lock:
+                with open(self.path, "a", encoding="utf-8") as file:
+                    file.write(json.dumps(entry) + "\n")
+            if response is None:
+                raise LLMBackendError(entry["error"])
+            return response
+
+        with self._lock:
+            entries = self._recordings.get(key, [])
+            index = self._cursors.get(key, 0)
+            if index >= len(entries):
+                raise LLMBackendError(f"No recorded response for request {key[:12]} (call #{index + 1})")
+            self._cursors[key] = index + 1
+        entry = entries[index]
+        if "error" in entry:
+            raise LLMBackendError(entry["error"])
+        return LLMResponse(entry["text"], entry["prompt_tokens"], entry["completion_tokens"])
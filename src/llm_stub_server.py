@@ -0,0 +1,176 @@
+# llm_stub_server.py
+#
+# A local OpenAI-compatible chat completions server for offline runs of FlashcardGenerator.
+#
+#   python llm_stub_server.py --port 8000 --latency 0.2 --error-rate 0.1
+#
+# and point the generator at it with OpenAIBackend(base_url="http://127.0.0.1:8000/v1").
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubConfig:
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_status=500,
+                 malformed_rate=0.0, duplicate_rate=0.0, seed=None):
+        """
+        Args:
+            latency (float): Base response latency in seconds.
+            jitter (float): Uniform random latency added on top of `latency`.
+            error_rate (float): Probability of answering with an HTTP error.
+            error_status (int): HTTP status used for injected errors (e.g. 429 or 500).
+            malformed_rate (float): Probability of a reply without the Question/Answer format.
+            duplicate_rate (float): Probability of repeating a previously generated question.
+            seed (Optional[int]): Seed for reproducible fault injection.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.malformed_rate = malformed_rate
+        self.duplicate_rate = duplicate_rate
+        self.random = random.Random(seed)
+        # Latency draws use their own generator, so fault injection stays reproducible under concurrency
+        self.latency_random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counter = 0
+        self.questions = []
+        self.requests = 0
+
+
+def _count_tokens(text):
+    # Rough estimate, good enough for throughput/cost accounting
+    return max(1, len(text) // 4)
+
+
+def _build_reply(config, messages):
+    """Return (status, reply_text) for a chat request."""
+    user_content = " ".join(m.get("content", "") for m in messages if m.get("role") == "user")
+    topic_match = re.search(r"topic '([^']*)'", user_content)
+    topic = topic_match.group(1) if topic_match else "machine learning"
+    question_match = re.search(r"which is (.*)\]", user_content)
+
+    with config.lock:
+        config.requests += 1
+        roll = config.random.random()
+        if roll < config.error_rate:
+            return config.error_status, None
+        roll = config.random.random()
+        if roll < config.malformed_rate:
+            return 200, f"Here is a flashcard about {topic}, but without the expected format."
+
+        if question_match:
+            question = question_match.group(1)
+        elif config.questions and config.random.random() < config.duplicate_rate:
+            question = config.random.choice(config.questions)
+        else:
+            config.counter += 1
+            question = f"Stub question #{config.counter}: how does {topic} behave in case {config.counter}?"
+            config.questions.append(question)
+
+    answer = (f"A deterministic stub answer about {topic}. It is long enough to pass validation "
+              f"and mentions the question: {question}")
+    return 200, f"Question: {question}\nAnswer: {answer}"
+
+
+def make_handler(config):
+    class StubHandler(BaseHTTPRequestHandler):
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": f"Unknown path {self.path}", "type": "not_found"}})
+                return
+
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            messages = request.get("messages", [])
+
+            with config.lock:
+                jitter = config.latency_random.uniform(0, config.jitter) if config.jitter else 0.0
+            delay = config.latency + jitter
+            if delay > 0:
+                time.sleep(delay)
+
+            status, text = _build_reply(config, messages)
+            if text is None:
+                self._send_json(status, {"error": {"message": "Injected stub error", "type": "server_error"}})
+                return
+
+            prompt_tokens = sum(_count_tokens(m.get("content", "")) for m in messages)
+            completion_tokens = _count_tokens(text)
+            self._send_json(200, {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model", "stub"),
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": text},
+                    "finish_reason": "stop",
+                }],
+                "usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens,
+                },
+            })
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub_server(host="127.0.0.1", port=0, **config_kwargs):
+    """
+    Start the stub server in a background thread.
+
+    Args:
+        host (str): Interface to bind.
+        port (int): Port to bind (0 picks a free port).
+        **config_kwargs: Passed to StubConfig.
+
+    Returns:
+        ThreadingHTTPServer: The running server. Its base url is
+            f"http://{host}:{server.server_address[1]}/v1"; call `shutdown()` to stop it.
+    """
+    server = ThreadingHTTPServer((host, port), make_handler(StubConfig(**config_kwargs)))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible stub server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--malformed-rate", type=float, default=0.0)
+    parser.add_argument("--duplicate-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = StubConfig(args.latency, args.jitter, args.error_rate, args.error_status,
+                        args.malformed_rate, args.duplicate_rate, args.seed)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(config))
+    print(f"Stub LLM server listening on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.shutdown()